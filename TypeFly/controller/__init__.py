@@ -1,4 +1,8 @@
+import logging
 from .yolo_client import YoloClient
 from .llm_controller import LLMController
 from .skillset import SkillSet, SkillItem, SkillArg
-#from .audiorecorder import AudioRecorder
\ No newline at end of file
+#from .audiorecorder import AudioRecorder
+
+# Per-frame debug output (e.g. YOLO responses) stays off unless explicitly enabled
+logging.getLogger(__name__).setLevel(logging.INFO)
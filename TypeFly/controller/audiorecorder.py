@@ -1,50 +1,163 @@
-import pyaudio
+import numpy as np
+import rtmixer
 import wave
-import threading
 import time
 import os
+import queue
+import threading
+
+class VADSegmenter:
+    """Split a live int16 stream into speech segments with Silero VAD"""
+    window_size = 512  # samples per VAD window at 16 kHz
+    
+    def __init__(self, sample_rate=16000, min_silence_duration_ms=500):
+        from silero_vad import load_silero_vad, VADIterator
+        
+        self.sample_rate = sample_rate
+        self.vad_iterator = VADIterator(
+            load_silero_vad(),
+            sampling_rate=sample_rate,
+            min_silence_duration_ms=min_silence_duration_ms
+        )
+        self.on_segment = None
+        self.blocks = queue.Queue()
+        self.thread = None
+    
+    def start(self, on_segment):
+        """Start consuming audio blocks, calling on_segment with float32 samples per utterance"""
+        self.on_segment = on_segment
+        self.pcm = bytearray()
+        self.offset = 0
+        self.speech_start = None
+        self.vad_iterator.reset_states()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+    
+    def feed(self, block):
+        """Queue an audio block, called from the recorder's drain thread"""
+        self.blocks.put(bytes(block))
+    
+    def stop(self):
+        """Process remaining audio and flush an unfinished utterance"""
+        if self.thread is None:
+            return
+        self.blocks.put(None)
+        self.thread.join()
+        self.thread = None
+        if self.speech_start is not None:
+            self._emit(self.speech_start, len(self.pcm) // 2)
+            self.speech_start = None
+    
+    def _samples(self, start, end):
+        return np.frombuffer(self.pcm, dtype=np.int16)[start:end].astype(np.float32) / 32768.0
+    
+    def _emit(self, start, end):
+        if end > start:
+            self.on_segment(self._samples(start, end))
+    
+    def _run(self):
+        while True:
+            block = self.blocks.get()
+            if block is None:
+                break
+            self.pcm.extend(block)
+            
+            while len(self.pcm) // 2 - self.offset >= self.window_size:
+                window = self._samples(self.offset, self.offset + self.window_size)
+                self.offset += self.window_size
+                event = self.vad_iterator(window)
+                if not event:
+                    continue
+                if 'start' in event:
+                    self.speech_start = event['start']
+                if 'end' in event and self.speech_start is not None:
+                    self._emit(self.speech_start, event['end'])
+                    self.speech_start = None
 
 class AudioRecorder:
+    ringbuffer_frames = 2 ** 18  # ~16 s at 16 kHz, power of two as PortAudio requires
+    
     def __init__(self, sample_rate=16000, channels=1, chunk_size=1024):
         self.sample_rate = sample_rate
         self.channels = channels
         self.chunk_size = chunk_size
-        self.format = pyaudio.paInt16
-        self.audio = pyaudio.PyAudio()
+        self.sample_width = 2
+        self.recorder = None
+        self.ringbuffer = None
+        self.action = None
+        self.drain_thread = None
         self.recording = False
-        self.frames = []
+        self.frames = bytearray()
+        self.segmenter = None
+        self.input_overflows = 0
+    
+    def _read_ringbuffer(self):
+        data = self.ringbuffer.read()
+        if len(data):
+            # rtmixer always captures float32, frames stay int16 PCM
+            samples = np.frombuffer(data, dtype=np.float32)
+            pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+            self.frames.extend(pcm)
+            if self.segmenter is not None:
+                self.segmenter.feed(pcm)
+    
+    def _drain(self):
+        """Move captured audio out of the ring buffer, a late wakeup only delays it"""
+        period = self.chunk_size / self.sample_rate
+        while self.recording:
+            self._read_ringbuffer()
+            time.sleep(period)
+        self._read_ringbuffer()
     
-    def start_recording(self):
-        """Start recording audio"""
-        self.recording = True
-        self.frames = []
+    def start_recording(self, segmenter=None):
+        """Start recording audio, optionally feeding a VADSegmenter"""
+        self.frames = bytearray()
+        self.segmenter = segmenter
         
         try:
-            stream = self.audio.open(
-                format=self.format,
+            # rtmixer's C callback writes into the ring buffer without taking the GIL
+            self.recorder = rtmixer.Recorder(
+                samplerate=self.sample_rate,
                 channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=self.chunk_size
+                blocksize=self.chunk_size
             )
-            
+            self.ringbuffer = rtmixer.RingBuffer(self.recorder.samplesize * self.channels, self.ringbuffer_frames)
+            self.recorder.start()
+            self.action = self.recorder.record_ringbuffer(self.ringbuffer)
+            self.recording = True
+            self.drain_thread = threading.Thread(target=self._drain, daemon=True)
+            self.drain_thread.start()
             print("🎤 Recording... Press Enter to stop")
             
-            while self.recording:
-                data = stream.read(self.chunk_size)
-                self.frames.append(data)
-            
-            stream.stop_stream()
-            stream.close()
-            print("⏹️  Recording stopped")
-            
         except Exception as e:
             print(f"Error during recording: {e}")
             self.recording = False
+            self._close_recorder()
     
     def stop_recording(self):
         """Stop recording"""
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.input_overflows = self.recorder.stats.input_overflows
+            if self.input_overflows:
+                print(f"Recording had {self.input_overflows} input overflows")
         self.recording = False
+        if self.drain_thread is not None:
+            self.drain_thread.join()
+            self.drain_thread = None
+        if self.recorder is not None:
+            self._close_recorder()
+            print("⏹️  Recording stopped")
+        if self.segmenter is not None:
+            self.segmenter.stop()
+            self.segmenter = None
+    
+    def _close_recorder(self):
+        if self.recorder is not None:
+            self.recorder.close()
+        self.recorder = None
+        self.ringbuffer = None
+        self.action = None
     
     def save_recording(self, filename="temp_recording.wav"):
         """Save recorded audio to file"""
@@ -56,9 +169,9 @@ class AudioRecorder:
                 
             wf = wave.open(filename, 'wb')
             wf.setnchannels(self.channels)
-            wf.setsampwidth(self.audio.get_sample_size(self.format))
+            wf.setsampwidth(self.sample_width)
             wf.setframerate(self.sample_rate)
-            wf.writeframes(b''.join(self.frames))
+            wf.writeframes(bytes(self.frames))
             wf.close()
             print(f"💾 Audio saved to {filename}")
             return filename
@@ -66,13 +179,13 @@ class AudioRecorder:
             print(f"Error saving audio: {e}")
             return None
     
-    def record_and_save(self, duration=None, filename=None):
+    def get_samples(self):
+        """Return recorded audio as float32 samples in [-1, 1)"""
+        return np.frombuffer(self.frames, dtype=np.int16).astype(np.float32) / 32768.0
+    
+    def record(self, duration=None, segmenter=None):
         """Record for specified duration or until stopped"""
-        if filename is None:
-            filename = f"temp_recording_{int(time.time())}.wav"
-            
-        recording_thread = threading.Thread(target=self.start_recording)
-        recording_thread.start()
+        self.start_recording(segmenter)
         
         if duration:
             time.sleep(duration)
@@ -81,10 +194,17 @@ class AudioRecorder:
             input()  # Wait for Enter key
             self.stop_recording()
         
-        recording_thread.join()
+        return self.get_samples()
+    
+    def record_and_save(self, duration=None, filename=None):
+        """Record for specified duration or until stopped, then save to file"""
+        if filename is None:
+            filename = f"temp_recording_{int(time.time())}.wav"
+            
+        self.record(duration)
         return self.save_recording(filename)
     
     def __del__(self):
-        """Cleanup PyAudio"""
-        if hasattr(self, 'audio'):
-            self.audio.terminate()
\ No newline at end of file
+        """Cleanup the recorder stream"""
+        if getattr(self, 'recorder', None) is not None:
+            self.recorder.close()
\ No newline at end of file
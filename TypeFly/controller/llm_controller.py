@@ -215,6 +215,11 @@ class LLMController():
                 # asynchronously send image to yolo server
                 asyncio_loop.call_soon_threadsafe(asyncio.create_task, self.yolo_client.detect(frame))
             time.sleep(0.10)
+        # Close the YOLO client's sessions/streams on the loop that owns them
+        try:
+            asyncio.run_coroutine_threadsafe(self.yolo_client.close(), asyncio_loop).result(timeout=3)
+        except Exception as e:
+            print_t(f"[C] Failed to close YOLO client: {e}")
         # Cancel all running tasks (if any)
         for task in asyncio.all_tasks(asyncio_loop):
             task.cancel()
@@ -1,28 +1,93 @@
 import os
+import re
+import json
 import ollama
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from faster_whisper import WhisperModel
 
 try:
-    from .audiorecorder import AudioRecorder
+    from .audiorecorder import AudioRecorder, VADSegmenter
 except ImportError:
-    from audiorecorder import AudioRecorder
+    from audiorecorder import AudioRecorder, VADSegmenter
 
 LLAMA3 = "llama3.2"
 
+# Keep the model resident in the Ollama server between requests
+OLLAMA_KEEP_ALIVE = "1h"
+# Short voice commands need neither the default 2048-token context nor long answers
+VOICE_CHAT_OPTIONS = {"num_predict": 128, "num_ctx": 512}
+
+# Prepended to the decoding context to bias Whisper towards the drone command vocabulary
+WHISPER_COMMAND_PROMPT = "Commands: find, look, count, move left, move right, forward, back, up, down, land, takeoff, what do you see"
+
+# Separate CT2 workers let back-to-back utterances transcribe in parallel, each on its share of the cores
+WHISPER_NUM_WORKERS = 2
+
+# Simple commands that map straight to a low-level skill without asking the LLM
+FAST_COMMAND_SKILLS = {
+    "land": "land",
+    "takeoff": "takeoff",
+    "forward": "move_forward",
+    "back": "move_backward",
+    "left": "move_left",
+    "right": "move_right",
+    "up": "move_up",
+    "down": "move_down",
+}
+FAST_COMMAND_DEFAULT_DISTANCE_CM = 100
+# Same range the Tello accepts for a single move, anything outside goes to the LLM instead
+FAST_COMMAND_MIN_DISTANCE_CM = 20
+FAST_COMMAND_MAX_DISTANCE_CM = 300
+
+PARENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WHISPER_MODEL_DIR = os.path.join(PARENT_DIR, "models")
+
+def resolve_whisper_model(whisper_model_size):
+    # Prefer a CT2 model pre-converted with `make convert-whisper`, fall back to the hub name
+    local_path = os.path.join(WHISPER_MODEL_DIR, f"whisper-{whisper_model_size}-ct2-int8")
+    if os.path.isdir(local_path):
+        return local_path
+    return whisper_model_size
+
 class LLMWrapper:
     def __init__(self, temperature=0.0, whisper_model_size="base", enable_audio=True):
         self.temperature = temperature
         self.enable_audio = enable_audio
+        self._ollama = ollama.Client()
         self.whisper_model = None
         self.audio_recorder = None
+        self.vad_segmenter = None
+        self.transcribe_executor = None
+        self._fast_grammar = re.compile(
+            r'^\s*(?:(?P<flight>land|take\s?off)'
+            r'|(?:move\s+)?(?P<direction>forward|back|left|right|up|down)'
+            r'(?:\s+(?P<amount>\d+)\s*(?P<unit>m|cm|meters?|centimeters?)?)?)\s*$',
+            re.I,
+        )
+
+        self._preload_model(LLAMA3)
 
         if self.enable_audio:
             self._initialize_audio(whisper_model_size)
 
+    def _preload_model(self, model_name):
+        # An empty prompt only loads the model, so the first real request skips the load stall
+        try:
+            self._ollama.generate(model=model_name, prompt="", keep_alive=OLLAMA_KEEP_ALIVE)
+        except Exception as e:
+            print(f"Could not preload '{model_name}': {e}")
+
     def _initialize_audio(self, whisper_model_size):
         try:
             print("🔄 Loading Whisper model...")
-            self.whisper_model = WhisperModel(whisper_model_size, device="cpu", compute_type="int8")
+            self.whisper_model = WhisperModel(
+                resolve_whisper_model(whisper_model_size),
+                device="cpu",
+                compute_type="int8",
+                cpu_threads=max(1, (os.cpu_count() or WHISPER_NUM_WORKERS) // WHISPER_NUM_WORKERS),
+                num_workers=WHISPER_NUM_WORKERS,
+            )
             self.audio_recorder = AudioRecorder()
             print(f"Whisper model '{whisper_model_size}' loaded successfully")
             print("Audio recording enabled")
@@ -30,14 +95,51 @@ class LLMWrapper:
             print(f"Audio initialization failed: {e}")
             print("Continuing with text-only mode")
             self.enable_audio = False
+            return
+
+        self.transcribe_executor = ThreadPoolExecutor(max_workers=WHISPER_NUM_WORKERS)
+        try:
+            self.vad_segmenter = VADSegmenter()
+            print("Streaming transcription enabled")
+        except Exception as e:
+            print(f"Streaming transcription unavailable: {e}")
+
+        self._warm_up_whisper()
+
+    def _warm_up_whisper(self):
+        # Transcribe one second of silence on every CT2 worker at once, so no first command lands on a cold copy
+        warmups = [self.transcribe_executor.submit(self._warm_up_worker) for _ in range(WHISPER_NUM_WORKERS)]
+        for warmup in warmups:
+            warmup.result()
+
+    def _warm_up_worker(self):
+        try:
+            segments, _ = self.whisper_model.transcribe(np.zeros(16000, dtype=np.float32), beam_size=1, language="en")
+            for _ in segments:
+                pass
+        except Exception as e:
+            print(f"Whisper warm-up failed: {e}")
 
-    def transcribe_audio(self, audio_file_path, language=None):
+    def transcribe_audio(self, audio, language=None, vad_filter=True):
+        # audio is either a WAV file path or float32 samples at 16 kHz
+        # pass vad_filter=False for segments VADSegmenter already cut
         if not self.enable_audio or self.whisper_model is None:
             return "Error: Audio functionality not available"
 
         try:
             print("Processing recorded audio...")
-            segments, info = self.whisper_model.transcribe(audio_file_path, language=language, beam_size=5, word_timestamps=True)
+            # Greedy decoding and VAD are enough for short push-to-talk drone commands
+            segments, info = self.whisper_model.transcribe(
+                audio,
+                language=language,
+                beam_size=1,
+                best_of=1,
+                word_timestamps=False,
+                condition_on_previous_text=False,
+                vad_filter=vad_filter,
+                vad_parameters=dict(min_silence_duration_ms=500),
+                initial_prompt=WHISPER_COMMAND_PROMPT,
+            )
             full_transcription = " ".join(segment.text for segment in segments)
             print(f"Detected language: {info.language} (confidence: {info.language_probability:.2f})")
             return full_transcription.strip()
@@ -50,36 +152,69 @@ class LLMWrapper:
             return "Error: Audio functionality not available"
 
         print("🎙️ Starting voice chat...")
-        audio_file = self.audio_recorder.record_and_save(duration)
-
-        if audio_file is None:
-            return "Error: Could not record audio"
-
         try:
-            transcribed_text = self.transcribe_audio(audio_file, language)
+            transcribed_text = self._record_and_transcribe(duration, language)
             if transcribed_text is None or transcribed_text.startswith("Error:"):
-                return "Error: Could not transcribe audio"
+                return transcribed_text or "Error: Could not transcribe audio"
 
             print(f"You said: {transcribed_text}")
-            response = self.request(transcribed_text, model_name, stream)
-
-            if os.path.exists(audio_file):
-                os.remove(audio_file)
-                print("Cleaned up temp audio file")
-
-            return response
+            plan = self.match_fast_command(transcribed_text)
+            if plan is not None:
+                print("Matched fast command, skipping LLM")
+                return plan
+            return self.request(transcribed_text, model_name, stream, options=VOICE_CHAT_OPTIONS)
         except Exception as e:
             print(f"❌ Error in voice chat: {e}")
-            if audio_file and os.path.exists(audio_file):
-                os.remove(audio_file)
             return None
 
-    def request(self, prompt, model_name=LLAMA3, stream=False):
+    def match_fast_command(self, text):
+        # Returns a JSON plan for exact-match commands like "land" or "forward 1m", else None
+        match = self._fast_grammar.match(text.strip().rstrip(".!?,"))
+        if match is None:
+            return None
+
+        if match.group("flight") is not None:
+            command = re.sub(r'\s+', '', match.group("flight").lower())
+            return json.dumps({"skill": FAST_COMMAND_SKILLS[command]})
+
+        distance = FAST_COMMAND_DEFAULT_DISTANCE_CM
+        amount, unit = match.group("amount"), match.group("unit")
+        if amount is not None:
+            distance = int(amount)
+            if unit is not None and unit.lower().startswith("m"):
+                distance *= 100
+        if not FAST_COMMAND_MIN_DISTANCE_CM <= distance <= FAST_COMMAND_MAX_DISTANCE_CM:
+            return None
+        return json.dumps({"skill": FAST_COMMAND_SKILLS[match.group("direction").lower()], "distance": distance})
+
+    def _record_and_transcribe(self, duration, language):
+        if self.vad_segmenter is None:
+            samples = self.audio_recorder.record(duration)
+            if samples.size == 0:
+                return "Error: Could not record audio"
+            return self.transcribe_audio(samples, language)
+
+        # Transcribe each utterance as soon as VAD closes it, overlapping ASR with recording
+        futures = []
+        self.vad_segmenter.start(lambda segment: futures.append(
+            self.transcribe_executor.submit(self.transcribe_audio, segment, language, False)))
+        samples = self.audio_recorder.record(duration, self.vad_segmenter)
+        if samples.size == 0:
+            return "Error: Could not record audio"
+        if not futures:
+            return self.transcribe_audio(samples, language)
+
+        texts = [future.result() for future in futures]
+        texts = [text for text in texts if text and not text.startswith("Error:")]
+        return " ".join(texts) if texts else None
+
+    def request(self, prompt, model_name=LLAMA3, stream=False, options=None):
         messages = [{"role": "user", "content": prompt}]
         if stream:
-            return ollama.chat(model=model_name, messages=messages, stream=True)
+            return self._ollama.chat(model=model_name, messages=messages, stream=True,
+                                     keep_alive=OLLAMA_KEEP_ALIVE, options=options)
 
-        resp = ollama.chat(model=model_name, messages=messages)
+        resp = self._ollama.chat(model=model_name, messages=messages, keep_alive=OLLAMA_KEEP_ALIVE, options=options)
         return resp["message"]["content"]
 
 if __name__ == "__main__":
@@ -102,4 +237,4 @@ if __name__ == "__main__":
         print("Run the voice demo with: python examples/voice_chat_demo.py")
     else:
         print("\n\n⚠️ Audio functionality not available")
-        print("Install with: pip install faster-whisper pyaudio")
+        print("Install with: pip install faster-whisper rtmixer")
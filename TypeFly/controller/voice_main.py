@@ -18,11 +18,11 @@ except ImportError:
     DroneWrapper = None
 
 class VoiceTypeFlyCont:
-    def __init__(self, use_virtual_robot=True):
+    def __init__(self, use_virtual_robot=True, whisper_model_size="tiny.en"):
         print("🚀 Initializing Voice TypeFly Controller")
         print("=" * 40)
 
-        self.llm = LLMWrapper(temperature=0.1, whisper_model_size="base", enable_audio=True)
+        self.llm = LLMWrapper(temperature=0.1, whisper_model_size=whisper_model_size, enable_audio=True)
         self.use_virtual_robot = use_virtual_robot
         self.drone = None
 
@@ -122,12 +122,12 @@ def main():
     import argparse
     parser = argparse.ArgumentParser(description="Voice-Controlled TypeFly Drone Controller")
     parser.add_argument("--use_virtual_robot", action="store_true", default=True, help="Use virtual robot instead of real drone")
-    parser.add_argument("--whisper_model", default="base", choices=["tiny", "base", "small", "medium", "large-v2"], help="Whisper model size")
+    parser.add_argument("--whisper_model", default="tiny.en", choices=["tiny.en", "tiny", "base", "small", "medium", "large-v2"], help="Whisper model size")
     args = parser.parse_args()
 
-    controller = VoiceTypeFlyCont(use_virtual_robot=args.use_virtual_robot)
+    controller = VoiceTypeFlyCont(use_virtual_robot=args.use_virtual_robot, whisper_model_size=args.whisper_model)
     if not controller.llm.enable_audio:
-        print("❌ Audio not available. Please install: pip install faster-whisper pyaudio")
+        print("❌ Audio not available. Please install: pip install faster-whisper rtmixer")
         return
 
     controller.interactive_voice_session()
@@ -1,11 +1,15 @@
-from io import BytesIO
 from PIL import Image, ImageDraw, ImageFont
-from typing import Optional
-import json
+from typing import Optional, Tuple
+from numpy.typing import NDArray
+import numpy as np
+import cv2
+import orjson
 import os
-import queue
+import logging
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
 from contextlib import asynccontextmanager
 
 from .utils import print_t
@@ -13,61 +17,92 @@ from .shared_frame import SharedFrame, Frame
 
 DIR = os.path.dirname(os.path.abspath(__file__))
 
+logger = logging.getLogger(__name__)
+
 VISION_SERVICE_IP = os.environ.get("VISION_SERVICE_IP", "localhost")
 ROUTER_SERVICE_PORT = os.environ.get("ROUTER_SERVICE_PORT", "50049")
+MAX_PENDING_FRAMES = 16
+
+# resize and JPEG encode release the GIL, so the async detect paths encode frames here, off the event loop
+ENCODE_POOL = ThreadPoolExecutor(max_workers=2)
+
+def encode_frame(image_buffer: NDArray[np.uint8], image_size: Optional[Tuple[int, int]] = None, quality=75) -> bytes:
+    """Resize an RGB frame buffer with INTER_AREA and encode it to JPEG bytes with OpenCV."""
+    if image_size is not None and (image_buffer.shape[1], image_buffer.shape[0]) != tuple(image_size):
+        image_buffer = cv2.resize(image_buffer, image_size, interpolation=cv2.INTER_AREA)
+    if image_buffer.ndim == 3:
+        code = cv2.COLOR_RGBA2BGR if image_buffer.shape[2] == 4 else cv2.COLOR_RGB2BGR
+        image_buffer = cv2.cvtColor(image_buffer, code)
+    return cv2.imencode('.jpg', image_buffer, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+class PendingFrames():
+    """Frames awaiting an async YOLO result, keyed by image_id. Used from a single asyncio task."""
+    def __init__(self, max_frames=MAX_PENDING_FRAMES):
+        self.max_frames = max_frames
+        self._frames = {}
+
+    def add(self, image_id: int, frame: Frame):
+        # bounded so lost responses cannot grow it forever
+        self._frames[image_id] = frame
+        if len(self._frames) > self.max_frames:
+            self._frames = {k: v for k, v in self._frames.items() if k > image_id - self.max_frames}
+
+    def match(self, image_id: int) -> Optional[Frame]:
+        # returns None for stale results, frames older than image_id are discarded
+        frame = self._frames.pop(image_id, None)
+        if frame is not None:
+            self._frames = {k: v for k, v in self._frames.items() if k > image_id}
+        return frame
 
 class YoloClient():
+    _FONT = None
+
     def __init__(self, shared_frame: Optional[SharedFrame] = None):
         self.service_url = f'http://{VISION_SERVICE_IP}:{ROUTER_SERVICE_PORT}/yolo'
         self.image_size = (640, 352)
-        self.frame_queue = queue.Queue()  # queue element: frame only for sync calls
+        self.pending_frames = PendingFrames()
         self.shared_frame = shared_frame
         self.frame_id = 0
         self.frame_id_lock = asyncio.Lock()
+        # Keep-alive connections reused across frames
+        self._session = requests.Session()
+        self._session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+        self._aiohttp_session = None
 
     def is_local_service(self):
         return VISION_SERVICE_IP == 'localhost'
 
     @staticmethod
-    def image_to_bytes(image: Image.Image) -> bytes:
-        """Convert PIL Image to compressed WEBP bytes."""
-        imgByteArr = BytesIO()
-        image.save(imgByteArr, format='WEBP')
-        return imgByteArr.getvalue()
+    def get_font() -> ImageFont.FreeTypeFont:
+        """Load the overlay font once and reuse it across plot calls."""
+        if YoloClient._FONT is None:
+            YoloClient._FONT = ImageFont.truetype(os.path.join(DIR, "assets/Roboto-Medium.ttf"), size=50)
+        return YoloClient._FONT
+
+    @staticmethod
+    def _draw_boxes(frame: Image.Image, corners: NDArray[np.float64], names):
+        """Draw normalized (x1, y1, x2, y2) boxes with labels, scaled to the frame in one vectorized step."""
+        draw = ImageDraw.Draw(frame)
+        font = YoloClient.get_font()
+        w, h = frame.size
+        coords = (corners * np.array([w, h, w, h])).astype(np.int32).tolist()
+
+        for (x1, y1, x2, y2), name in zip(coords, names):
+            draw.rectangle((x1, y1, x2, y2), fill=None, outline='blue', width=4)
+            draw.text((x1, y1 - 50), name, fill='red', font=font)
 
     @staticmethod
     def plot_results(frame: Image.Image, results):
         """Draw bounding boxes and labels on frame from results dict."""
-        if results is None:
+        if not results:
             return
 
-        def str_float_to_int(value, multiplier):
-            return int(float(value) * multiplier)
-
-        draw = ImageDraw.Draw(frame)
-        font_path = os.path.join(DIR, "assets/Roboto-Medium.ttf")
-        font = ImageFont.truetype(font_path, size=50)
-        w, h = frame.size
-
-        for result in results:
-            box = result.get("box", {})
-            draw.rectangle(
-                (
-                    str_float_to_int(box.get("x1", 0), w),
-                    str_float_to_int(box.get("y1", 0), h),
-                    str_float_to_int(box.get("x2", 0), w),
-                    str_float_to_int(box.get("y2", 0), h),
-                ),
-                fill=None,
-                outline='blue',
-                width=4,
-            )
-            draw.text(
-                (str_float_to_int(box.get("x1", 0), w), str_float_to_int(box.get("y1", 0), h) - 50),
-                result.get("name", ""),
-                fill='red',
-                font=font,
-            )
+        boxes = [result.get("box", {}) for result in results]
+        corners = np.array(
+            [[float(box.get(key, 0)) for key in ("x1", "y1", "x2", "y2")] for box in boxes],
+            dtype=np.float64,
+        )
+        YoloClient._draw_boxes(frame, corners, [result.get("name", "") for result in results])
 
     @staticmethod
     def plot_results_oi(frame: Image.Image, object_list):
@@ -75,32 +110,17 @@ class YoloClient():
         if not object_list:
             return
 
-        def str_float_to_int(value, multiplier):
-            return int(float(value) * multiplier)
-
-        draw = ImageDraw.Draw(frame)
-        font_path = os.path.join(DIR, "assets/Roboto-Medium.ttf")
-        font = ImageFont.truetype(font_path, size=50)
-        w, h = frame.size
+        xywh = np.array([[obj.x, obj.y, obj.w, obj.h] for obj in object_list], dtype=np.float64)
+        half = xywh[:, 2:] / 2
+        corners = np.hstack((xywh[:, :2] - half, xywh[:, :2] + half))
+        YoloClient._draw_boxes(frame, corners, [obj.name for obj in object_list])
 
-        for obj in object_list:
-            draw.rectangle(
-                (
-                    str_float_to_int(obj.x - obj.w / 2, w),
-                    str_float_to_int(obj.y - obj.h / 2, h),
-                    str_float_to_int(obj.x + obj.w / 2, w),
-                    str_float_to_int(obj.y + obj.h / 2, h),
-                ),
-                fill=None,
-                outline='blue',
-                width=4,
-            )
-            draw.text(
-                (str_float_to_int(obj.x - obj.w / 2, w), str_float_to_int(obj.y - obj.h / 2, h) - 50),
-                obj.name,
-                fill='red',
-                font=font,
-            )
+    async def close(self):
+        """Close the HTTP sessions kept open across frames."""
+        if self._aiohttp_session is not None and not self._aiohttp_session.closed:
+            await self._aiohttp_session.close()
+        self._aiohttp_session = None
+        self._session.close()
 
     def retrieve(self) -> Optional[SharedFrame]:
         return self.shared_frame
@@ -119,9 +139,7 @@ class YoloClient():
                 print_t("[Y] Warning: frame.image is None")
                 return
 
-            resized_image = image.resize(self.image_size)
-            image_bytes = self.image_to_bytes(resized_image)
-            self.frame_queue.put(frame)
+            image_bytes = encode_frame(frame.image_buffer, self.image_size)
 
             config = {
                 'user_name': 'yolo',
@@ -130,17 +148,16 @@ class YoloClient():
                 'conf': conf,
             }
             files = {
-                'image': ('image.webp', image_bytes),
-                'json_data': (None, json.dumps(config)),
+                'image': ('image.jpg', image_bytes),
+                'json_data': (None, orjson.dumps(config)),
             }
 
-            print_t(f"[Y] Sending request to {self.service_url}")
-            response = requests.post(self.service_url, files=files)
-            print_t(f"[Y] Response: {response.text}")
+            response = self._session.post(self.service_url, files=files)
+            logger.debug("[Y] Response: %s", response.content)
 
-            json_results = json.loads(response.text)
+            json_results = orjson.loads(response.content)
             if self.shared_frame is not None:
-                self.shared_frame.set(self.frame_queue.get(), json_results)
+                self.shared_frame.set(frame, json_results)
 
             self.frame_id += 1
 
@@ -151,15 +168,18 @@ class YoloClient():
     async def get_aiohttp_session_response(self, service_url, data, timeout_seconds=3):
         """
         Async context manager for aiohttp POST request with timeout.
+        The ClientSession is created on first use and reused for later requests.
         """
         import aiohttp
 
+        if self._aiohttp_session is None or self._aiohttp_session.closed:
+            self._aiohttp_session = aiohttp.ClientSession()
+
         timeout = aiohttp.ClientTimeout(total=timeout_seconds)
         try:
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(service_url, data=data) as response:
-                    response.raise_for_status()
-                    yield response
+            async with self._aiohttp_session.post(service_url, data=data, timeout=timeout) as response:
+                response.raise_for_status()
+                yield response
         except aiohttp.ServerTimeoutError:
             print_t(f"[Y] Timeout error when connecting to {service_url}")
         except Exception as e:
@@ -179,11 +199,11 @@ class YoloClient():
             print_t("[Y] Warning: frame.image is None in async detect")
             return
 
-        resized_image = image.resize(self.image_size)
-        image_bytes = self.image_to_bytes(resized_image)
+        loop = asyncio.get_running_loop()
+        image_bytes = await loop.run_in_executor(ENCODE_POOL, encode_frame, frame.image_buffer, self.image_size)
 
         async with self.frame_id_lock:
-            self.frame_queue.put((self.frame_id, frame))
+            self.pending_frames.add(self.frame_id, frame)
             config = {
                 'user_name': 'yolo',
                 'stream_mode': True,
@@ -192,7 +212,7 @@ class YoloClient():
             }
             files = {
                 'image': image_bytes,
-                'json_data': json.dumps(config),
+                'json_data': orjson.dumps(config).decode(),  # str keeps it a plain form field
             }
             self.frame_id += 1
 
@@ -200,22 +220,17 @@ class YoloClient():
             if response is None:
                 print_t("[Y] No response received from YOLO server.")
                 return
-            results = await response.text()
+            results = await response.read()
 
         try:
-            json_results = json.loads(results)
-        except json.JSONDecodeError:
+            json_results = orjson.loads(results)
+        except orjson.JSONDecodeError:
             print_t(f"[Y] Invalid JSON results: {results}")
             return
 
-        # Discard old images
-        if self.frame_queue.empty():
-            return
-        while self.frame_queue.queue[0][0] < json_results.get('image_id', -1):
-            self.frame_queue.get()
-        # Discard old results
-        if self.frame_queue.queue[0][0] > json_results.get('image_id', -1):
+        frame = self.pending_frames.match(json_results.get('image_id', -1))
+        if frame is None:
             return
 
         if self.shared_frame is not None:
-            self.shared_frame.set(self.frame_queue.get()[1], json_results)
+            self.shared_frame.set(frame, json_results)
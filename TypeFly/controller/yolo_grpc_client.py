@@ -1,13 +1,12 @@
-from io import BytesIO
 from PIL import Image
 from typing import Optional, List
 
-import json, sys, os
-import queue
+import sys, os
+import orjson
 import grpc
 import asyncio
 
-from .yolo_client import SharedFrame, Frame
+from .yolo_client import SharedFrame, Frame, encode_frame, ENCODE_POOL, PendingFrames
 from .utils import print_t
 
 PARENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -28,26 +27,78 @@ class YoloGRPCClient():
         self.stub = hyrch_serving_pb2_grpc.YoloServiceStub(channel)
         self.is_async_inited = False
         self.image_size = (640, 352)
-        self.frame_queue = queue.Queue()
+        self.pending_frames = PendingFrames()
         self.shared_frame = shared_frame
         self.frame_id_lock = asyncio.Lock()
         self.frame_id = 0
+        self._detect_call = None
+        self._detect_consumer = None
+        self.closed = False
 
     def init_async_channel(self):
-        channel_async = grpc.aio.insecure_channel(f'{VISION_SERVICE_IP}:{YOLO_SERVICE_PORT}')
-        self.stub_async = hyrch_serving_pb2_grpc.YoloServiceStub(channel_async)
+        self.channel_async = grpc.aio.insecure_channel(f'{VISION_SERVICE_IP}:{YOLO_SERVICE_PORT}')
+        self.stub_async = hyrch_serving_pb2_grpc.YoloServiceStub(self.channel_async)
         self.is_async_inited = True
 
+    def open_detect_stream(self):
+        # one bidirectional stream carries all frames, responses are handled by a background task
+        self._cancel_detect_stream()
+        self._detect_call = self.stub_async.DetectBidi()
+        self._detect_consumer = asyncio.create_task(self._consume_detect_responses(self._detect_call))
+
+    def _cancel_detect_stream(self):
+        # drop a broken stream and its reader so neither outlives the replacement
+        if self._detect_call is not None:
+            self._detect_call.cancel()
+            self._detect_call = None
+        if self._detect_consumer is not None:
+            if self._detect_consumer is not asyncio.current_task():
+                self._detect_consumer.cancel()
+            self._detect_consumer = None
+
+    async def close(self):
+        """Half-close the DetectBidi stream, wait briefly for in-flight results and close the channel."""
+        # detect() calls still encoding a frame see the flag and drop it instead of reopening a stream
+        self.closed = True
+        async with self.frame_id_lock:
+            if self._detect_call is not None:
+                try:
+                    await self._detect_call.done_writing()
+                    if self._detect_consumer is not None:
+                        await asyncio.wait_for(asyncio.shield(self._detect_consumer), timeout=1)
+                except (grpc.aio.AioRpcError, grpc.aio.UsageError, asyncio.InvalidStateError, asyncio.TimeoutError):
+                    pass
+            self._cancel_detect_stream()
+            if self.is_async_inited:
+                await self.channel_async.close()
+                self.is_async_inited = False
+
+    async def _consume_detect_responses(self, detect_call):
+        try:
+            async for response in detect_call:
+                try:
+                    json_results = orjson.loads(response.json_data)
+                    self._handle_detect_response(json_results)
+                except (orjson.JSONDecodeError, KeyError, TypeError) as e:
+                    print_t(f"[Y] Invalid DetectBidi response: {e}")
+        except grpc.aio.AioRpcError as e:
+            if e.code() != grpc.StatusCode.CANCELLED:
+                print_t(f"[Y] DetectBidi stream closed: {e.code()}")
+        finally:
+            if self._detect_call is detect_call:
+                self._detect_call = None
+
+    def _handle_detect_response(self, json_results):
+        frame = self.pending_frames.match(json_results['image_id'])
+        if frame is None:
+            return
+
+        if self.shared_frame is not None:
+            self.shared_frame.set(frame, json_results)
+
     def is_local_service(self):
         return VISION_SERVICE_IP == 'localhost'
 
-    @staticmethod
-    def image_to_bytes(image):
-        # compress and convert the image to bytes
-        imgByteArr = BytesIO()
-        image.save(imgByteArr, format='WEBP')
-        return imgByteArr.getvalue()
-
     def retrieve(self) -> Optional[SharedFrame]:
         # This function seems incomplete, but we will leave it for now.
         # It's not causing the current error.
@@ -59,19 +110,20 @@ class YoloGRPCClient():
         image = frame.image
         if image is None: return
 
-        image_bytes = YoloGRPCClient.image_to_bytes(image.resize(self.image_size))
-        self.frame_queue.put(frame)
+        image_bytes = encode_frame(frame.image_buffer, self.image_size)
 
         detect_request = hyrch_serving_pb2.DetectRequest(image_data=image_bytes, conf=conf)
         response = self.stub.DetectStream(detect_request)
         
-        json_results = json.loads(response.json_data)
+        json_results = orjson.loads(response.json_data)
         if self.shared_frame is not None:
-            if not self.frame_queue.empty():
-                self.shared_frame.set(self.frame_queue.get(), json_results)
+            self.shared_frame.set(frame, json_results)
 
     # <<< FIX: This is the asynchronous function, restored to its correct state >>>
     async def detect(self, frame: Frame, conf=0.1):
+        if self.closed:
+            return
+
         if not self.is_async_inited:
             self.init_async_channel()
 
@@ -83,26 +135,23 @@ class YoloGRPCClient():
         if image is None: return
         
         # do not resize for demo
-        image_bytes = YoloGRPCClient.image_to_bytes(image)
+        loop = asyncio.get_running_loop()
+        image_bytes = await loop.run_in_executor(ENCODE_POOL, encode_frame, frame.image_buffer)
+        if self.closed:
+            return
+        # the lock also serializes writes, the stream allows only one pending write
         async with self.frame_id_lock:
+            if self.closed:
+                return
             image_id = self.frame_id
-            self.frame_queue.put((self.frame_id, frame))
+            self.pending_frames.add(self.frame_id, frame)
             self.frame_id += 1
 
-        detect_request = hyrch_serving_pb2.DetectRequest(image_id=image_id, image_data=image_bytes, conf=conf)
-        response = await self.stub_async.Detect(detect_request)
-    
-        json_results = json.loads(response.json_data)
-        if self.frame_queue.empty():
-            return
-        
-        # discard old images
-        while not self.frame_queue.empty() and self.frame_queue.queue[0][0] < json_results['image_id']:
-            self.frame_queue.get()
-        
-        # discard old results
-        if self.frame_queue.empty() or self.frame_queue.queue[0][0] > json_results['image_id']:
-            return
-            
-        if self.shared_frame is not None:
-            self.shared_frame.set(self.frame_queue.get()[1], json_results)
\ No newline at end of file
+            detect_request = hyrch_serving_pb2.DetectRequest(image_id=image_id, image_data=image_bytes, conf=conf)
+            try:
+                if self._detect_call is None:
+                    self.open_detect_stream()
+                await self._detect_call.write(detect_request)
+            except (grpc.aio.AioRpcError, grpc.aio.UsageError, asyncio.InvalidStateError) as e:
+                print_t(f"[Y] Failed to send frame on DetectBidi stream: {e}")
+                self._cancel_detect_stream()
\ No newline at end of file
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13hyrch_serving.proto\"U\n\rDetectRequest\x12\x15\n\x08image_id\x18\x01 \x01(\x05H\x00\x88\x01\x01\x12\x12\n\nimage_data\x18\x02 \x01(\x0c\x12\x0c\n\x04\x63onf\x18\x03 \x01(\x02\x42\x0b\n\t_image_id\"#\n\x0e\x44\x65tectResponse\x12\x11\n\tjson_data\x18\x01 \x01(\t\"&\n\x0fSetClassRequest\x12\x13\n\x0b\x63lass_names\x18\x01 \x03(\t\"\"\n\x10SetClassResponse\x12\x0e\n\x06result\x18\x01 \x01(\t\"J\n\rPromptRequest\x12\x11\n\tjson_data\x18\x01 \x01(\t\x12\x17\n\nimage_data\x18\x02 \x01(\x0cH\x00\x88\x01\x01\x42\r\n\x0b_image_data\"#\n\x0ePromptResponse\x12\x11\n\tjson_data\x18\x01 \x01(\t2m\n\x0bYoloService\x12\x31\n\x0c\x44\x65tectStream\x12\x0e.DetectRequest\x1a\x0f.DetectResponse\"\x00\x12+\n\x06\x44\x65tect\x12\x0e.DetectRequest\x1a\x0f.DetectResponse\"\x00\x32\x41\n\rLlama2Service\x12\x30\n\x0b\x43hatRequest\x12\x0e.PromptRequest\x1a\x0f.PromptResponse\"\x00\x32\x42\n\x0cLlavaService\x12\x32\n\rVisionRequest\x12\x0e.PromptRequest\x1a\x0f.PromptResponse\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13hyrch_serving.proto\"U\n\rDetectRequest\x12\x15\n\x08image_id\x18\x01 \x01(\x05H\x00\x88\x01\x01\x12\x12\n\nimage_data\x18\x02 \x01(\x0c\x12\x0c\n\x04\x63onf\x18\x03 \x01(\x02\x42\x0b\n\t_image_id\"#\n\x0e\x44\x65tectResponse\x12\x11\n\tjson_data\x18\x01 \x01(\t\"&\n\x0fSetClassRequest\x12\x13\n\x0b\x63lass_names\x18\x01 \x03(\t\"\"\n\x10SetClassResponse\x12\x0e\n\x06result\x18\x01 \x01(\t\"J\n\rPromptRequest\x12\x11\n\tjson_data\x18\x01 \x01(\t\x12\x17\n\nimage_data\x18\x02 \x01(\x0cH\x00\x88\x01\x01\x42\r\n\x0b_image_data\"#\n\x0ePromptResponse\x12\x11\n\tjson_data\x18\x01 \x01(\t2\xa2\x01\n\x0bYoloService\x12\x31\n\x0c\x44\x65tectStream\x12\x0e.DetectRequest\x1a\x0f.DetectResponse\"\x00\x12+\n\x06\x44\x65tect\x12\x0e.DetectRequest\x1a\x0f.DetectResponse\"\x00\x12\x33\n\nDetectBidi\x12\x0e.DetectRequest\x1a\x0f.DetectResponse\"\x00(\x01\x30\x01\x32\x41\n\rLlama2Service\x12\x30\n\x0b\x43hatRequest\x12\x0e.PromptRequest\x1a\x0f.PromptResponse\"\x00\x32\x42\n\x0cLlavaService\x12\x32\n\rVisionRequest\x12\x0e.PromptRequest\x1a\x0f.PromptResponse\"\x00\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -43,10 +43,10 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_PROMPTREQUEST']._serialized_end=297
   _globals['_PROMPTRESPONSE']._serialized_start=299
   _globals['_PROMPTRESPONSE']._serialized_end=334
-  _globals['_YOLOSERVICE']._serialized_start=336
-  _globals['_YOLOSERVICE']._serialized_end=445
-  _globals['_LLAMA2SERVICE']._serialized_start=447
-  _globals['_LLAMA2SERVICE']._serialized_end=512
-  _globals['_LLAVASERVICE']._serialized_start=514
-  _globals['_LLAVASERVICE']._serialized_end=580
+  _globals['_YOLOSERVICE']._serialized_start=337
+  _globals['_YOLOSERVICE']._serialized_end=499
+  _globals['_LLAMA2SERVICE']._serialized_start=501
+  _globals['_LLAMA2SERVICE']._serialized_end=566
+  _globals['_LLAVASERVICE']._serialized_start=568
+  _globals['_LLAVASERVICE']._serialized_end=634
 # @@protoc_insertion_point(module_scope)
@@ -44,6 +44,11 @@ class YoloServiceStub(object):
                 request_serializer=hyrch__serving__pb2.DetectRequest.SerializeToString,
                 response_deserializer=hyrch__serving__pb2.DetectResponse.FromString,
                 _registered_method=True)
+        self.DetectBidi = channel.stream_stream(
+                '/YoloService/DetectBidi',
+                request_serializer=hyrch__serving__pb2.DetectRequest.SerializeToString,
+                response_deserializer=hyrch__serving__pb2.DetectResponse.FromString,
+                _registered_method=True)
 
 
 class YoloServiceServicer(object):
@@ -61,6 +66,12 @@ class YoloServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def DetectBidi(self, request_iterator, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_YoloServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -74,6 +85,11 @@ def add_YoloServiceServicer_to_server(servicer, server):
                     request_deserializer=hyrch__serving__pb2.DetectRequest.FromString,
                     response_serializer=hyrch__serving__pb2.DetectResponse.SerializeToString,
             ),
+            'DetectBidi': grpc.stream_stream_rpc_method_handler(
+                    servicer.DetectBidi,
+                    request_deserializer=hyrch__serving__pb2.DetectRequest.FromString,
+                    response_serializer=hyrch__serving__pb2.DetectResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'YoloService', rpc_method_handlers)
@@ -139,6 +155,33 @@ class YoloService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def DetectBidi(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/YoloService/DetectBidi',
+            hyrch__serving__pb2.DetectRequest.SerializeToString,
+            hyrch__serving__pb2.DetectResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
 
 class Llama2ServiceStub(object):
     """Missing associated documentation comment in .proto file."""
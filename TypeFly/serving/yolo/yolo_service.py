@@ -7,6 +7,8 @@ import grpc
 import torch
 from ultralytics import YOLO
 import multiprocessing
+import threading
+import queue
 
 PARENT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -15,6 +17,8 @@ SERVICE_PORT = os.environ.get("YOLO_SERVICE_PORT", "50050, 50051").split(",")
 
 MODEL_PATH = os.path.join(ROOT_PATH, "./serving/yolo/models/")
 MODEL_TYPE = "yolov8x.pt"
+# A DetectBidi stream holds one worker for its whole lifetime, leave room for unary callers
+SERVER_MAX_WORKERS = 4
 
 sys.path.append(ROOT_PATH)
 sys.path.append(os.path.join(ROOT_PATH, "proto/generated"))
@@ -44,6 +48,8 @@ class YoloService(hyrch_serving_pb2_grpc.YoloServiceServicer):
         self.stream_mode = False
         self.model = load_model()
         self.port = port
+        # workers share one model, so mode switches and inference are serialized
+        self.model_lock = threading.Lock()
 
     def reload_model(self):
         if self.model is not None:
@@ -93,27 +99,75 @@ class YoloService(hyrch_serving_pb2_grpc.YoloServiceServicer):
         }
         return json.dumps(result)
 
+    def detect(self, image, request, stream_mode):
+        with self.model_lock:
+            if self.stream_mode != stream_mode:
+                self.stream_mode = stream_mode
+                self.reload_model()
+            return hyrch_serving_pb2.DetectResponse(json_data=self.process_image(image, request.image_id, request.conf))
+
     def DetectStream(self, request, context):
         print(f"Received DetectStream request from {context.peer()} on port {self.port}, image_id: {request.image_id}")
-        if not self.stream_mode:
-            self.stream_mode = True
-            self.reload_model()
-        
         image = YoloService.bytes_to_image(request.image_data)
-        return hyrch_serving_pb2.DetectResponse(json_data=self.process_image(image, request.image_id, request.conf))
+        return self.detect(image, request, stream_mode=True)
     
     def Detect(self, request, context):
         print(f"Received Detect request from {context.peer()} on port {self.port}, image_id: {request.image_id}")
-        if self.stream_mode:
-            self.stream_mode = False
-            self.reload_model()
-
         image = YoloService.bytes_to_image(request.image_data)
-        return hyrch_serving_pb2.DetectResponse(json_data=self.process_image(image, request.image_id, request.conf))
+        return self.detect(image, request, stream_mode=False)
+
+    def DetectBidi(self, request_iterator, context):
+        print(f"Opened DetectBidi stream from {context.peer()} on port {self.port}")
+        decoded = queue.Queue(maxsize=4)
+
+        # give up once the client is gone, so a full queue cannot block the decoder forever
+        def put(item):
+            while context.is_active():
+                try:
+                    decoded.put(item, timeout=0.5)
+                    return
+                except queue.Full:
+                    pass
+
+        # the end-of-stream sentinel must always arrive, drop queued frames to make room for it
+        def finish():
+            while True:
+                try:
+                    decoded.put_nowait(None)
+                    return
+                except queue.Full:
+                    try:
+                        decoded.get_nowait()
+                    except queue.Empty:
+                        pass
+
+        # receive and decode the next frames while the current one is on the model
+        def decode_requests():
+            try:
+                for request in request_iterator:
+                    image = YoloService.bytes_to_image(request.image_data)
+                    image.load()
+                    put((request, image))
+            except Exception as e:
+                print(f"DetectBidi stream from {context.peer()} ended: {e}")
+            finally:
+                finish()
+
+        context.add_callback(finish)
+        threading.Thread(target=decode_requests, daemon=True).start()
+        while context.is_active():
+            try:
+                item = decoded.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            request, image = item
+            yield self.detect(image, request, stream_mode=False)
 
 def serve(port):
     print(f"Starting YoloService at port {port}")
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=1))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=SERVER_MAX_WORKERS))
     hyrch_serving_pb2_grpc.add_YoloServiceServicer_to_server(YoloService(port), server)
     server.add_insecure_port(f'[::]:{port}')
     server.start()